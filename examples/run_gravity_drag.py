@@ -1,5 +1,5 @@
 from pathlib import Path
-import json, os
+import os
 from worldsim_core.models import World
 from worldsim_core.resolver import resolve_cards
 from worldsim_core.validate import validate
@@ -13,7 +13,7 @@ def main():
     print("WORLD PATH:", WORLD_PATH, "exists:", WORLD_PATH.exists())
     print("RULEGRAPH_CARD_PATHS =", os.environ.get("RULEGRAPH_CARD_PATHS"))
 
-    world = World(**json.loads(WORLD_PATH.read_text(encoding="utf-8")))
+    world = World.model_validate_json(WORLD_PATH.read_bytes())
     refs = [getattr(d, "ref", d.get("ref")) for d in world.dynamics]
     print("Dynamics refs:", refs)
 
@@ -1,5 +1,4 @@
 from pathlib import Path
-import json
 from worldsim_core.models import World
 from worldsim_core.resolver import resolve_cards
 from worldsim_core.validate import validate
@@ -10,7 +9,7 @@ HERE = Path(__file__).resolve().parent
 WORLD_PATH = HERE / "data" / "worlds" / "two-body.demo.json"
 
 if __name__ == "__main__":
-    world = World(**json.loads(WORLD_PATH.read_text()))
+    world = World.model_validate_json(WORLD_PATH.read_bytes())
 
     world.config = dict(world.config or {})
     world.config["dtSeconds"] = 120.0
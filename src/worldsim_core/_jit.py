@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Any
+
+# Optional Numba support. Kernels decorated with `njit` are compiled when numba is
+# installed (pip install worldsim-core[jit]). Without it `njit` returns the function
+# unchanged and `prange` is `range`, so the kernels still run as plain Python; the
+# solvers and audits check HAVE_NUMBA and take their NumPy paths instead, which are
+# much faster than interpreted kernels (accels_barnes_hut and the tests still call
+# the kernels directly).
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    HAVE_NUMBA = False
+    prange = range  # type: ignore[misc]
+
+    def njit(*args: Any, **kwargs: Any) -> Any:  # type: ignore[no-redef]
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+__all__ = ["HAVE_NUMBA", "njit", "prange"]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+# JSON I/O helpers: orjson when installed (pip install worldsim-core[io]),
+# stdlib json otherwise. Both load to the same Python objects and pretty-print
+# with the same layout (orjson may spell some floats differently, e.g. 0.00001).
+
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:  # pragma: no cover - exercised only without orjson
+    HAVE_ORJSON = False
+
+def loads(data: bytes | str) -> Any:
+    if HAVE_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# below this a plain read is cheaper than setting up a mapping
+_MMAP_MIN_BYTES = 64 * 1024
+
+def read_json(path: Path) -> Any:
+    """
+    Parse a JSON file. Large files are memory-mapped and parsed in place when
+    orjson is available (it accepts a memoryview), so the bytes stay in the page
+    cache instead of being copied onto the Python heap.
+    """
+    return read_json_stat(path)[1]
+
+def read_json_stat(path: Path) -> tuple[os.stat_result, Any]:
+    """
+    read_json plus the os.fstat of the descriptor the bytes were read from, taken
+    before reading; it describes the parsed file even if the path is replaced later.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if HAVE_ORJSON and st.st_size >= _MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return st, orjson.loads(view)
+        return st, loads(f.read())
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()   # orjson's native datetime output is the same RFC 3339 text
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj: Any, indent: bool = True) -> bytes:
+    """UTF-8 JSON: two-space indented, or compact (no whitespace) with indent=False."""
+    if HAVE_ORJSON:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, default=_default).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), default=_default).encode("utf-8")
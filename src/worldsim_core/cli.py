@@ -1,6 +1,5 @@
 from __future__ import annotations
 from pathlib import Path
-import json
 import argparse
 from .models import World
 from .resolver import resolve_cards
@@ -14,11 +13,12 @@ def main() -> None:
     ap.add_argument("--dt", type=float, help="Override dtSeconds")
     ap.add_argument("--steps", type=int, help="Override steps")
     ap.add_argument("--lock", default="run.lock.json", help="Path to write lockfile JSON")
+    ap.add_argument("--compact-lock", action="store_true", help="Write the lockfile without indentation")
     args = ap.parse_args()
 
     world_path = Path(args.world)
-    data = json.loads(world_path.read_text(encoding="utf-8"))
-    w = World(**data)
+    # validate straight from bytes in pydantic-core (no intermediate dict)
+    w = World.model_validate_json(world_path.read_bytes())
 
     if args.dt is not None or args.steps is not None:
         w.config = dict(w.config or {})
@@ -35,5 +35,5 @@ def main() -> None:
         raise SystemExit(2)
 
     run = simulate(w, cards)
-    write_lockfile(run, cards, args.lock)
+    write_lockfile(run, cards, args.lock, compact=args.compact_lock)
     print(f"Steps={run.steps} dt={run.dt_seconds} drifts={run.drifts} lock={args.lock}")
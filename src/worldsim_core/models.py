@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import BaseModel, Field
 
 # ---- Pydantic stubs (strict-enough for v0) ----
@@ -20,7 +20,6 @@ class State(BaseModel):
     position: Vec3Quantity
     velocity: Vec3Quantity
 
-from typing import Literal
 class Body(BaseModel):
     id: str
     type: Literal["rg:Body"] = "rg:Body"
@@ -33,14 +32,12 @@ class Frame(BaseModel):
     metric: str
     units: Dict[str, str]  # {length, time, mass}
 
-# --- Insert Equation model ---
 class Equation(BaseModel):
     name: Optional[str] = None
     machine: Optional[str] = None
     tex: Optional[str] = None
     ast: Optional[Dict[str, Any]] = None  # allow structured AST
 
-# --- Update LawCard and World models ---
 class LawCard(BaseModel):
     id: str  # e.g. rg:law/physics.gravity.newton.v1
     version: str
@@ -105,4 +102,9 @@ class ValidationIssue(BaseModel):
 
 class ValidationReport(BaseModel):
     ok: bool
-    issues: List[ValidationIssue] = []
\ No newline at end of file
+    issues: List[ValidationIssue] = []
+
+# resolve forward refs ("Parameter", "World.Selector", ...) at import time rather than
+# on first validation
+LawCard.model_rebuild()
+World.model_rebuild()
\ No newline at end of file
@@ -1,16 +1,17 @@
 from __future__ import annotations
-import json
 from pathlib import Path
 from typing import Dict
 from datetime import datetime, timezone
 
 from .models import LawCard
+from . import _json
 
 
-def write_lockfile(run_result, cards: Dict[str, LawCard], path: str | Path):
+def write_lockfile(run_result, cards: Dict[str, LawCard], path: str | Path, compact: bool = False):
+    """Write the run lockfile; `compact` drops indentation (smaller CI artifacts)."""
     path = Path(path)
     payload = {
-        "generatedAt": datetime.now(timezone.utc).isoformat(),
+        "generatedAt": datetime.now(timezone.utc),  # serialized as ISO 8601
         "dtSeconds": run_result.dt_seconds,
         "steps": run_result.steps,
         "cards": {
@@ -22,5 +23,5 @@ def write_lockfile(run_result, cards: Dict[str, LawCard], path: str | Path):
         },
         "drifts": run_result.drifts,
     }
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    path.write_bytes(_json.dumps(payload, indent=not compact))
     return path
\ No newline at end of file
@@ -2,28 +2,151 @@
 from __future__ import annotations
 from pathlib import Path
 from typing import Dict, List, Iterable, Optional
-import os, json, hashlib
+import os, json, hashlib, functools
+from concurrent.futures import ThreadPoolExecutor
 
 from .models import LawCard
+from . import _json
 
 # ---- canonical hash (sha256 over canonical JSON with 'sha256' removed) ----
+# Canonical form: keys sorted, "," / ":" separators, ASCII-only (\uXXXX escapes),
+# floats spelled by repr(). Published card digests depend on these exact bytes, so
+# faster serializers that spell floats or non-ASCII text differently (orjson emits
+# 0.00001 for 1e-05 and raw UTF-8) must not be swapped in here.
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
 def _canonical_sha256(payload: dict) -> str:
-    to_hash = dict(payload)
-    to_hash.pop("sha256", None)
-    blob = json.dumps(to_hash, sort_keys=True, separators=(",", ":")).encode()
-    return hashlib.sha256(blob).hexdigest()
+    to_hash = {k: v for k, v in payload.items() if k != "sha256"}
+    return hashlib.sha256(_CANONICAL_ENCODER.encode(to_hash).encode()).hexdigest()
 
 def _load_lawcard_from_path(path: Path, verify_hash: bool = True) -> LawCard:
-    data = json.loads(path.read_text(encoding="utf-8"))
-    card = LawCard(**data)
-    if verify_hash and card.sha256:
+    st = path.stat()
+    card = _load_lawcard_cached(
+        str(path.resolve()), st.st_mtime_ns, st.st_ctime_ns, st.st_size, verify_hash
+    )
+    # callers own their copy; the cached instance stays pristine
+    return card.model_copy(deep=True)
+
+@functools.lru_cache(maxsize=256)
+def _load_lawcard_cached(
+    path: str, mtime_ns: int, ctime_ns: int, size: int, verify_hash: bool
+) -> LawCard:
+    """Parse (and verify) a card file; (mtime_ns, ctime_ns, size) in the key invalidates edits."""
+    p = Path(path)
+    st, data = _json.read_json_stat(p)
+    return _build_lawcard(data, p, st, verify_hash)
+
+def _build_lawcard(
+    data: dict, path: Path, st: os.stat_result, verify_hash: bool = True
+) -> LawCard:
+    """
+    Validate an already-parsed card payload and (by default) verify its sha256.
+    `st` is the stat of the file the payload was read from. Verification is
+    skipped when the disk cache shows that exact file (same mtime, ctime and
+    size) already verified against the same digest.
+    """
+    card = LawCard.model_validate(data)
+    if verify_hash and card.sha256 and not _already_verified(path, st, card.sha256):
         actual = _canonical_sha256(data)
         if actual != card.sha256:
             raise ValueError(
                 f"sha256 mismatch for {path.name}: expected {card.sha256}, computed {actual}"
             )
+        _remember_verified(path, st, card.id, card.sha256)
     return card
 
+# ---- persistent card cache --------------------------------------------------
+# path -> {mtime_ns, ctime_ns, size, id[, sha256]}; "sha256" is recorded only once
+# the file's canonical hash has been verified. ctime is part of the key because,
+# unlike mtime, it cannot be set back from user space after an in-place edit.
+# (cache file, entries) memo so a process reads the cache file once
+_DISK_CACHE: Optional[tuple[Optional[Path], dict[str, dict]]] = None
+
+def _cache_file() -> Optional[Path]:
+    """
+    Location of the on-disk card cache.
+    RULEGRAPH_CARD_CACHE overrides it (empty string disables caching);
+    default is $XDG_CACHE_HOME/rulegraph/cards_index.json.
+    """
+    env = os.environ.get("RULEGRAPH_CARD_CACHE")
+    if env is not None:
+        return Path(env) if env.strip() else None
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "rulegraph" / "cards_index.json"
+
+def _read_disk_cache() -> dict[str, dict]:
+    global _DISK_CACHE
+    path = _cache_file()
+    if _DISK_CACHE is not None and _DISK_CACHE[0] == path:
+        return _DISK_CACHE[1]
+    data: object = {}
+    if path is not None and path.is_file():
+        try:
+            data = _json.read_json(path)
+        except (OSError, ValueError):
+            data = {}
+    entries = data if isinstance(data, dict) else {}
+    _DISK_CACHE = (path, entries)
+    return entries
+
+def _write_disk_cache(entries: dict[str, dict]) -> None:
+    path = _cache_file()
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entries, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        # the cache is an optimisation only; never fail a resolution over it
+        pass
+
+def _stat_fields(st: os.stat_result) -> dict[str, int]:
+    return {"mtime_ns": st.st_mtime_ns, "ctime_ns": st.st_ctime_ns, "size": st.st_size}
+
+def _fresh_entry(cache: dict[str, dict], p: Path) -> Optional[dict]:
+    """The cache entry for `p` if the file is unchanged since it was recorded."""
+    entry = cache.get(str(p))
+    if not entry:
+        return None
+    stat = _stat_fields(p.stat())
+    return entry if all(entry.get(k) == v for k, v in stat.items()) else None
+
+def _read_payload(p: Path) -> tuple[os.stat_result, object] | Exception:
+    """stat + parse one candidate file; errors are returned, not raised (runs in workers)."""
+    try:
+        return _json.read_json_stat(p)
+    except Exception as e:
+        return e
+
+def _read_payloads(paths: list[Path]) -> list[tuple[os.stat_result, object] | Exception]:
+    # Reading cards is I/O plus parsing; fan out over threads when there is enough
+    # to read (cold cache, large libraries). Results keep the input order.
+    if len(paths) < _PARALLEL_READ_MIN:
+        return [_read_payload(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as ex:
+        return list(ex.map(_read_payload, paths))
+
+def _already_verified(path: Path, st: os.stat_result, digest: str) -> bool:
+    # compared with the stat of the bytes in hand, not of whatever is on disk now
+    entry = _read_disk_cache().get(str(path))
+    if not entry or entry.get("sha256") != digest:
+        return False
+    return all(entry.get(k) == v for k, v in _stat_fields(st).items())
+
+def _remember_verified(path: Path, st: os.stat_result, card_id: str, digest: str) -> None:
+    # `st` describes the bytes that were hashed; if the file changed since they were
+    # read, the digest vouches for nothing on disk and is not recorded
+    try:
+        if _stat_fields(path.stat()) != _stat_fields(st):
+            return
+    except OSError:
+        return
+    cache = _read_disk_cache()
+    cache[str(path)] = {**_stat_fields(st), "id": card_id, "sha256": digest}
+    _write_disk_cache(cache)
+
 # ---- search path assembly ---------------------------------------------------
 def _env_paths() -> list[Path]:
     """Parse RULEGRAPH_CARD_PATHS (dirs or index.json files), pathsep-aware."""
@@ -59,8 +182,27 @@ def _dev_mono_repo_paths() -> list[Path]:
     return candidates
 
 def _iter_json_files_in_dir(d: Path) -> Iterable[Path]:
-    # walk recursively for *.json
-    yield from d.rglob("*.json")
+    """
+    Walk d recursively for *.json with os.scandir (no per-entry Path objects or
+    pattern matching). Like rglob, a directory's own files come before its
+    subdirectories and unreadable directories are skipped; symlinked directories
+    are not followed.
+    """
+    stack = [os.fspath(d)]
+    while stack:
+        top = stack.pop()
+        subdirs: list[str] = []
+        try:
+            with os.scandir(top) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        subdirs.append(e.path)
+                    elif e.name.endswith(".json"):
+                        yield Path(e.path)
+        except OSError:
+            continue
+        # reversed so subdirectories are visited in listing order
+        stack.extend(reversed(subdirs))
 
 def _load_index(index_path: Path) -> dict[str, Path]:
     """
@@ -68,7 +210,7 @@ def _load_index(index_path: Path) -> dict[str, Path]:
     Example file (lawcards/index.json):
       { "rg:law/gravity.newton.v1": "cards/physics/gravity/gravity.newton.v1.json", ... }
     """
-    mapping = json.loads(index_path.read_text(encoding="utf-8"))
+    mapping = _json.read_json(index_path)
     out: dict[str, Path] = {}
     base = index_path.parent
     if isinstance(mapping, dict):
@@ -112,12 +254,83 @@ def _gather_search_space() -> tuple[list[Path], dict[str, Path]]:
             seen.add(rp)
     return (dedup_dirs, index_by_id)
 
+# ---- directory index --------------------------------------------------------
+# below this many files to (re)read, a thread pool costs more than it saves
+_PARALLEL_READ_MIN = 32
+
+# (search_dirs, id -> candidate paths in scan order, last scan error)
+_DIR_INDEX: Optional[tuple[tuple[Path, ...], dict[str, list[Path]], Optional[Exception]]] = None
+
+def _build_index(
+    search_dirs: list[Path], want: Optional[str] = None
+) -> tuple[dict[str, list[Path]], Optional[Exception], dict[Path, tuple[os.stat_result, dict]]]:
+    """
+    Scan every search directory once, mapping card id -> candidate files.
+    Payloads parsed during the scan whose id is `want` are returned as well (with
+    the stat they were read under), so the caller can build that card without
+    reading the file again.
+    """
+    by_id: dict[str, list[Path]] = {}
+    parsed: dict[Path, tuple[os.stat_result, dict]] = {}
+    last_error: Optional[Exception] = None
+    cache = _read_disk_cache()
+
+    paths = [p for d in search_dirs if d.exists() for p in _iter_json_files_in_dir(d)]
+    ids: list[Optional[str]] = [None] * len(paths)
+    stale: list[int] = []
+    for k, p in enumerate(paths):
+        try:
+            entry = _fresh_entry(cache, p)
+        except OSError as e:
+            last_error = e
+            continue
+        if entry is not None:
+            ids[k] = entry.get("id")   # unchanged file: id from the cache, no read
+        else:
+            stale.append(k)
+
+    # only the main thread touches the cache and the index
+    for k, res in zip(stale, _read_payloads([paths[k] for k in stale])):
+        if isinstance(res, Exception):
+            last_error = res
+            continue
+        st, data = res
+        cid = data.get("id") if isinstance(data, dict) else None
+        cache[str(paths[k])] = {**_stat_fields(st), "id": cid}
+        ids[k] = cid
+        if isinstance(data, dict) and cid is not None and cid == want:
+            parsed[paths[k]] = (st, data)
+    # forget files that disappeared from the scanned directories
+    seen = set(map(str, paths))
+    prefixes = tuple(os.path.join(str(d), "") for d in search_dirs)
+    gone = [key for key in cache if key.startswith(prefixes) and key not in seen]
+    for key in gone:
+        del cache[key]
+    if stale or gone:
+        _write_disk_cache(cache)
+
+    for p, cid in zip(paths, ids):
+        if cid:
+            by_id.setdefault(cid, []).append(p)
+    return by_id, last_error, parsed
+
+def _dir_index(
+    search_dirs: list[Path], refresh: bool = False, want: Optional[str] = None
+) -> tuple[dict[str, list[Path]], Optional[Exception], dict[Path, tuple[os.stat_result, dict]]]:
+    global _DIR_INDEX
+    key = tuple(search_dirs)
+    if refresh or _DIR_INDEX is None or _DIR_INDEX[0] != key:
+        by_id, err, parsed = _build_index(search_dirs, want)
+        _DIR_INDEX = (key, by_id, err)
+        return by_id, err, parsed
+    return _DIR_INDEX[1], _DIR_INDEX[2], {}
+
 # ---- resolution -------------------------------------------------------------
-def _resolve_iri_to_path(ref: str) -> Optional[Path]:
+def _resolve_iri(ref: str) -> Optional[LawCard]:
     """
-    Resolve a LawCard id (IRI) to a local JSON file using:
+    Resolve a LawCard id (IRI) to a verified card loaded from a local JSON file using:
       - any explicit index.json from RULEGRAPH_CARD_PATHS
-      - scanning configured search directories (recursive)
+      - an id index built once from the configured search directories (recursive)
     Cards whose sha256 does not verify are ignored (useful for *badhash* fixtures).
     """
     search_dirs, index_by_id = _gather_search_space()
@@ -127,28 +340,28 @@ def _resolve_iri_to_path(ref: str) -> Optional[Path]:
         p = index_by_id[ref]
         if p.exists():
             try:
-                _ = _load_lawcard_from_path(p, verify_hash=True)
-                return p
+                return _load_lawcard_from_path(p, verify_hash=True)
             except Exception:
                 # if indexed file fails verification, treat as not found
                 pass
 
-    # 1) scan dirs for a matching id
-    last_error: Optional[Exception] = None
-    for d in search_dirs:
-        if not d.exists():
-            continue
-        for p in _iter_json_files_in_dir(d):
+    # 1) look the id up in the directory index; a miss (or a stale entry) triggers
+    #    one rebuild in case cards were added or edited since the index was built
+    fresh = _DIR_INDEX is None or _DIR_INDEX[0] != tuple(search_dirs)
+    for attempt in range(1 if fresh else 2):
+        by_id, last_error, parsed = _dir_index(search_dirs, refresh=attempt > 0, want=ref)
+        for p in by_id.get(ref, []):
             try:
-                data = json.loads(p.read_text(encoding="utf-8"))
-                if data.get("id") != ref:
-                    continue
                 # verify; skip if bad (e.g., *badhash* fixtures)
-                _ = _load_lawcard_from_path(p, verify_hash=True)
-                return p
+                if p in parsed:
+                    st, data = parsed[p]
+                    card = _build_lawcard(data, p, st, verify_hash=True)
+                else:
+                    card = _load_lawcard_from_path(p, verify_hash=True)
+                if card.id == ref:
+                    return card
             except Exception as e:
                 last_error = e
-                continue
 
     if last_error:
         # surface the last parse/verify error to aid debugging
@@ -168,12 +381,12 @@ def resolve_cards(law_refs: List[str]) -> Dict[str, LawCard]:
         if p.exists():
             card = _load_lawcard_from_path(p)  # direct path: verify hash
         else:
-            p2 = _resolve_iri_to_path(ref)
-            if not p2:
+            found = _resolve_iri(ref)  # already verified
+            if found is None:
                 raise FileNotFoundError(
                     f"Cannot resolve LawCard ref '{ref}'. "
                     f"Provide a local path or set RULEGRAPH_CARD_PATHS."
                 )
-            card = _load_lawcard_from_path(p2, verify_hash=True)
+            card = found
         out[card.id] = card
     return out
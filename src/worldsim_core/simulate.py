@@ -1,13 +1,13 @@
 from __future__ import annotations
+import inspect
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 import numpy as np
 
 from .models import World, LawCard
-from .invariants import audit_invariants, rel_drift
+from .invariants import AuditContext, rel_drift
 from .solvers import VerletNBodySolver
-import math
-from typing import Any
+from ._jit import HAVE_NUMBA
 
 @dataclass
 class RunResult:
@@ -30,19 +30,37 @@ class SolverRegistry:
             raise KeyError(f"No solver registered for law '{law_id}'")
         return self._by_law[law_id]
 
+# steps between two in-loop invariant audits
+_CHECK_EVERY = 100
+
 DEFAULT_REGISTRY = SolverRegistry()
 DEFAULT_REGISTRY.register("rg:law/physics.gravity.newton.v1", VerletNBodySolver())
 
 def _world_to_arrays(world: World):
-    m = np.array([e.mass.value for e in world.entities], dtype=float)
-    r = np.array([e.state.position.value for e in world.entities], dtype=float)
-    v = np.array([e.state.velocity.value for e in world.entities], dtype=float)
+    """Flatten entity state once per run into contiguous float64 m (N,), r (N,3), v (N,3)."""
+    n = len(world.entities)
+    # a single walk over the entities into one (N,7) block [m | r | v], then split
+    rows = []
+    for e in world.entities:
+        pos = e.state.position.value
+        vel = e.state.velocity.value
+        # checked per entity: a short position would otherwise borrow velocity components
+        if len(pos) != 3 or len(vel) != 3:
+            raise ValueError(f"Entity '{e.id}': position and velocity must have 3 components")
+        rows.append((e.mass.value, *pos, *vel))
+    block = np.array(rows, dtype=np.float64).reshape(n, 7)
+    m = np.ascontiguousarray(block[:, 0])
+    r = np.ascontiguousarray(block[:, 1:4])
+    v = np.ascontiguousarray(block[:, 4:7])
     return m, r, v
 
 def _arrays_to_world(world: World, r: np.ndarray, v: np.ndarray):
-    for i, e in enumerate(world.entities):
-        e.state.position.value = r[i].tolist()
-        e.state.velocity.value = v[i].tolist()
+    # one C-level conversion per array; rows of the nested lists are handed out as-is
+    r_rows = r.tolist()
+    v_rows = v.tolist()
+    for e, ri, vi in zip(world.entities, r_rows, v_rows):
+        e.state.position.value = ri
+        e.state.velocity.value = vi
 
 def _config_dt(world: World) -> float:
     cfg = world.config or {}
@@ -56,7 +74,14 @@ def _config_steps(world: World) -> int:
         return int(cfg["steps"])
     return 0
 
-def simulate(world: World, cards: Dict[str, LawCard], registry: Optional[SolverRegistry] = None) -> RunResult:
+def simulate(
+    world: World,
+    cards: Dict[str, LawCard],
+    registry: Optional[SolverRegistry] = None,
+    write_back: bool = True,
+) -> RunResult:
+    # write_back=False leaves world.entities untouched; the final r, v are still in
+    # RunResult.final_state (for runs that only read drifts/invariants).
     registry = registry or DEFAULT_REGISTRY
     dyn = list(world.dynamics or [])
     # helpers to read Dynamic whether it's a pydantic object or a dict
@@ -68,7 +93,7 @@ def simulate(world: World, cards: Dict[str, LawCard], registry: Optional[SolverR
     grav_ref = next((_dyn_ref(d) for d in dyn if _dyn_ref(d) == "rg:law/physics.gravity.newton.v1"), None)
     law_ref = grav_ref or _dyn_ref(dyn[0])
     law = cards.get(law_ref) or next((c for c in cards.values() if c.id == law_ref), None)
-    solver = registry.get(law.id)
+    solver: Any = registry.get(law.id)
 
     m, r, v = _world_to_arrays(world)
     state = {"t": 0.0, "r": r, "v": v, "m": m}
@@ -100,35 +125,53 @@ def simulate(world: World, cards: Dict[str, LawCard], registry: Optional[SolverR
         ov = override.get(name) if isinstance(override, dict) else getattr(override, name, None)
         return float(ov) if ov is not None else float(default)
 
-    def _external_accels(v_now: np.ndarray) -> np.ndarray:
-        """Sum accelerations from non-gravity cards (drag, etc.)."""
-        aext = np.zeros_like(r)
-        for d in dyn:
-            cref = _dyn_ref(d)
-            if cref == law.id:
-                continue  # gravity handled by solver
-            card = cards.get(cref) or next((c for c in cards.values() if c.id == cref), None)
-            if card is None:
-                continue
-            mask = _mask_from_selector(_dyn_get(d, "selector", None), r.shape[0])
-            # Linear drag: F = -gamma * v  => a = F/m = -(gamma/m) * v
-            if card.id == "rg:law/fluids.drag.linear.v1":
-                gamma = _param(d, "gamma", card.parameters["gamma"].value)
-                invm = (1.0 / m)[:, None]
-                aext[mask] += (-(gamma) * invm[mask]) * v_now[mask]
-            # Quadratic drag: F = -Cq * |v| * v  => a = -(Cq/m) * |v| * v
-            elif card.id == "rg:law/fluids.drag.quadratic.v1":
-                Cq = _param(d, "Cq", card.parameters["Cq"].value)
-                invm = (1.0 / m)[:, None]
-                speed = np.linalg.norm(v_now, axis=1)[:, None]
-                aext[mask] += (-(Cq) * invm[mask]) * (speed[mask] * v_now[mask])
-            # (future) other laws can be plugged here
-        return aext
-
+    card_memo: Dict[str, Optional[LawCard]] = {}
     def _card_by_ref(ref: str) -> LawCard | None:
-        c = cards.get(ref)
-        if c: return c
-        return next((cc for cc in cards.values() if cc.id == ref), None)
+        if ref not in card_memo:
+            c = cards.get(ref)
+            card_memo[ref] = c if c else next((cc for cc in cards.values() if cc.id == ref), None)
+        return card_memo[ref]
+
+    # Per-body drag coefficients are fixed for the run: resolve cards, selectors and
+    # overrides once into (kind, idx, -coeff/m) terms. idx holds the selected body
+    # indices, or None when the term applies to every body (whole-array ops).
+    invm = (1.0 / m)[:, None]
+    external_terms = []
+    for d in dyn:
+        cref = _dyn_ref(d)
+        if cref == law.id:
+            continue  # gravity handled by solver
+        card = _card_by_ref(cref)
+        if card is None:
+            continue
+        mask = _mask_from_selector(_dyn_get(d, "selector", None), r.shape[0])
+        idx = None if mask.all() else np.flatnonzero(mask)
+        coeff_m = invm if idx is None else invm[idx]
+        # Linear drag: F = -gamma * v  => a = F/m = -(gamma/m) * v
+        if card.id == "rg:law/fluids.drag.linear.v1":
+            gamma = _param(d, "gamma", card.parameters["gamma"].value)
+            external_terms.append(("linear", idx, -(gamma) * coeff_m))
+        # Quadratic drag: F = -Cq * |v| * v  => a = -(Cq/m) * |v| * v
+        elif card.id == "rg:law/fluids.drag.quadratic.v1":
+            Cq = _param(d, "Cq", card.parameters["Cq"].value)
+            external_terms.append(("quadratic", idx, -(Cq) * coeff_m))
+        # (future) other laws can be plugged here
+
+    def _external_accels(v_now: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Sum accelerations from non-gravity cards (drag, etc.) into `out`."""
+        out.fill(0.0)
+        for kind, idx, coeff in external_terms:
+            vm = v_now if idx is None else v_now[idx]
+            if kind == "linear":
+                term = coeff * vm
+            else:
+                speed = np.linalg.norm(vm, axis=1)[:, None]
+                term = coeff * (speed * vm)
+            if idx is None:
+                out += term
+            else:
+                out[idx] += term
+        return out
 
     has_dissipative = any(
         bool((getattr(_card_by_ref(_dyn_ref(d)), "invariants", {}) or {}).get("dissipative", False))
@@ -136,7 +179,8 @@ def simulate(world: World, cards: Dict[str, LawCard], registry: Optional[SolverR
     )
 
     G = law.parameters["G"].value if hasattr(law, "parameters") and "G" in law.parameters else 0.0
-    inv0 = audit_invariants(G, m, r, v)
+    audit = AuditContext.build(G, m)   # pair indices / mass products hoisted out of the loop
+    inv0 = audit.audit(r, v)
 
     budgets = (law.invariants or {}).get("driftBudget", {})
     budget_energy = float(budgets.get("Energy", {}).get("rel", 1.0))
@@ -144,27 +188,82 @@ def simulate(world: World, cards: Dict[str, LawCard], registry: Optional[SolverR
     budget_angmom = float(budgets.get("AngularMomentum", {}).get("rel", 1.0))
 
     gross_factor = 10.0
+    # only budgeted invariants are audited in the loop; none budgeted, no check at all
+    want = {k for k, b in (("Energy", budget_energy), ("LinearMomentum", budget_linmom),
+                           ("AngularMomentum", budget_angmom)) if b < 1.0}
+    need_check = bool(want)
 
     steps = _config_steps(world)
     dt = _config_dt(world)
 
-    for i in range(steps):
-        # gravity accelerations (positions only)
-        a_g = solver.accelerations(state, law)
-        # external (e.g., drag) — use current velocity
-        a_e = _external_accels(state["v"])
-        a1 = a_g + a_e
-        v_half = state["v"] + 0.5 * dt * a1
-        r_new = state["r"] + dt * v_half
-        # recompute gravity on new positions
-        a_g2 = solver.accelerations({"r": r_new, "m": state["m"]}, law)
-        # approx external at half-step velocity
-        a_e2 = _external_accels(v_half)
-        v_new = v_half + 0.5 * dt * (a_g2 + a_e2)
-        state = {"t": state["t"] + dt, "r": r_new, "v": v_new, "m": state["m"]}
-
-        if (i + 1) % 100 == 0 or i + 1 == steps:
-            inv = audit_invariants(G, m, state["r"], state["v"])
+    # Kick-drift-kick: gravity at the end of one step is gravity at the start of the
+    # next, so it is carried over instead of recomputed. Drag depends on the
+    # velocity, which changes in the closing kick, so it is evaluated each time.
+    r, v = state["r"], state["v"]
+    t = state["t"]
+    a_g = solver.accelerations(state, law)
+    kick = np.empty_like(v)
+    # Every array below is updated in place: no per-step allocations or state dicts.
+    # Registered third-party solvers may not take `out=`; they get a fresh array.
+    grav_state = {"r": r, "m": m}
+    accels_out = "out" in inspect.signature(solver.accelerations).parameters
+
+    def _advance(k: int) -> None:
+        nonlocal a_g, t, r, v, kick   # r, v, kick are updated in place
+        for _ in range(k):
+            _external_accels(v, out=kick)
+            kick += a_g
+            kick *= 0.5 * dt
+            v += kick                                   # v_half
+            np.multiply(v, dt, out=kick)
+            r += kick
+            if accels_out:
+                solver.accelerations(grav_state, law, out=a_g)
+            else:
+                a_g = solver.accelerations(grav_state, law)
+            # approx external at half-step velocity
+            _external_accels(v, out=kick)
+            kick += a_g
+            kick *= 0.5 * dt
+            v += kick
+            t += dt
+
+    # With numba the steps between two audits run as one compiled call; drag terms
+    # fold into per-body coefficient vectors for it. That call has the gravity of
+    # VerletNBodySolver built in, so it is only taken for solvers whose force and
+    # stepping methods are exactly those; an override would be silently skipped.
+    compiled = HAVE_NUMBA and all(
+        getattr(type(solver), name, None) is getattr(VerletNBodySolver, name)
+        for name in ("accelerations", "_accels", "step_many")
+    )
+    if compiled:
+        lin = np.zeros(m.shape[0])
+        quad = np.zeros(m.shape[0])
+        for kind, idx, coeff in external_terms:
+            target = lin if kind == "linear" else quad
+            if idx is None:
+                target += coeff[:, 0]
+            else:
+                target[idx] += coeff[:, 0]
+
+    done = 0
+    invN = None
+    while done < steps:
+        k = min(_CHECK_EVERY, steps - done)
+        if compiled:
+            out = solver.step_many({"t": t, "r": r, "v": v, "m": m}, law, dt, k,
+                                   lin_drag=lin, quad_drag=quad, accels=a_g)
+            r, v, a_g, t = out["r"], out["v"], out["a"], out["t"]
+        else:
+            _advance(k)
+        done += k
+
+        if done == steps:
+            # the last check doubles as the final audit: all invariants
+            inv = invN = audit.audit(r, v)
+        elif need_check:
+            inv = audit.audit(r, v, want=want)
+        if need_check:
             dE = rel_drift(inv["Energy"], inv0["Energy"]) if budget_energy < 1.0 else 0.0
             dP = rel_drift(inv["LinearMomentum"], inv0["LinearMomentum"]) if budget_linmom < 1.0 else 0.0
             dL = rel_drift(inv["AngularMomentum"], inv0["AngularMomentum"]) if budget_angmom < 1.0 else 0.0
@@ -174,13 +273,16 @@ def simulate(world: World, cards: Dict[str, LawCard], registry: Optional[SolverR
                 (budget_angmom < 1.0 and dL > gross_factor * budget_angmom)
             ):
                 break
+    state = {"t": t, "r": r, "v": v, "m": m}
 
-    invN = audit_invariants(G, m, state["r"], state["v"])
+    if invN is None:   # stopped early on a gross drift
+        invN = audit.audit(state["r"], state["v"])
 
-    _arrays_to_world(world, state["r"], state["v"])
+    if write_back:
+        _arrays_to_world(world, state["r"], state["v"])
 
     return RunResult(
-        steps=i + 1,
+        steps=done,
         dt_seconds=dt,
         final_state=state,
         initial_invariants=inv0,
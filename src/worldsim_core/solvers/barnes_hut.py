@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from .._jit import njit, prange
+
+# Barnes-Hut octree for O(N log N) gravity.
+#
+# The tree lives in flat arrays so both the build and the traversal compile with
+# numba (callers only dispatch here when it is available):
+#   child[k, 0..7]  child node per octant, -1 if empty
+#   body[k]         first body of a leaf, -1 for internal nodes
+#   next_body[b]    next body in the same leaf (only bodies that stay together
+#                   past _MAX_DEPTH, i.e. coincident ones, share a leaf)
+#   center/half     cube centre and half-width of each node
+#   mass/com        total mass and centre of mass of each node
+# Children are always created after their parent, so walking node indices
+# backwards visits children before parents.
+
+_MAX_DEPTH = 48
+
+@njit(cache=True)
+def _build_octree(m, r):
+    n = r.shape[0]
+    cap = 2 * n + 16
+    child = np.full((cap, 8), -1, dtype=np.int64)
+    body = np.full(cap, -1, dtype=np.int64)
+    depth = np.zeros(cap, dtype=np.int64)
+    center = np.zeros((cap, 3))
+    half = np.zeros(cap)
+    next_body = np.full(n, -1, dtype=np.int64)
+
+    lo0 = r[:, 0].min()
+    lo1 = r[:, 1].min()
+    lo2 = r[:, 2].min()
+    hi0 = r[:, 0].max()
+    hi1 = r[:, 1].max()
+    hi2 = r[:, 2].max()
+    center[0, 0] = 0.5 * (lo0 + hi0)
+    center[0, 1] = 0.5 * (lo1 + hi1)
+    center[0, 2] = 0.5 * (lo2 + hi2)
+    h = 0.5 * max(hi0 - lo0, hi1 - lo1, hi2 - lo2)
+    half[0] = h * (1.0 + 1e-9) if h > 0.0 else 1.0
+    body[0] = 0
+    count = 1
+
+    for b in range(1, n):
+        node = 0
+        while True:
+            if body[node] >= 0:
+                if depth[node] >= _MAX_DEPTH:
+                    # (near-)coincident bodies: chain them in this leaf
+                    next_body[b] = body[node]
+                    body[node] = b
+                    break
+                # split the leaf: push its body one level down, then retry as internal
+                old = body[node]
+                body[node] = -1
+                target = old
+            else:
+                target = b
+            o = 0
+            if r[target, 0] >= center[node, 0]:
+                o |= 1
+            if r[target, 1] >= center[node, 1]:
+                o |= 2
+            if r[target, 2] >= center[node, 2]:
+                o |= 4
+            c = child[node, o]
+            if c >= 0:
+                node = c          # only reachable for target == b
+                continue
+            if count == cap:
+                cap2 = 2 * cap
+                child2 = np.full((cap2, 8), -1, dtype=np.int64)
+                child2[:cap] = child
+                child = child2
+                body2 = np.full(cap2, -1, dtype=np.int64)
+                body2[:cap] = body
+                body = body2
+                depth2 = np.zeros(cap2, dtype=np.int64)
+                depth2[:cap] = depth
+                depth = depth2
+                center2 = np.zeros((cap2, 3))
+                center2[:cap] = center
+                center = center2
+                half2 = np.zeros(cap2)
+                half2[:cap] = half
+                half = half2
+                cap = cap2
+            c = count
+            count += 1
+            hc = 0.5 * half[node]
+            half[c] = hc
+            depth[c] = depth[node] + 1
+            center[c, 0] = center[node, 0] + (hc if o & 1 else -hc)
+            center[c, 1] = center[node, 1] + (hc if o & 2 else -hc)
+            center[c, 2] = center[node, 2] + (hc if o & 4 else -hc)
+            body[c] = target
+            child[node, o] = c
+            if target == b:
+                break
+            # the displaced body is placed; loop again on the same node for b
+
+    mass = np.zeros(count)
+    com = np.zeros((count, 3))
+    for k in range(count - 1, -1, -1):
+        mk = 0.0
+        cx = 0.0
+        cy = 0.0
+        cz = 0.0
+        if body[k] >= 0:
+            j = body[k]
+            while j >= 0:
+                mk += m[j]
+                cx += m[j] * r[j, 0]
+                cy += m[j] * r[j, 1]
+                cz += m[j] * r[j, 2]
+                j = next_body[j]
+        else:
+            for o in range(8):
+                c = child[k, o]
+                if c >= 0:
+                    mk += mass[c]
+                    cx += mass[c] * com[c, 0]
+                    cy += mass[c] * com[c, 1]
+                    cz += mass[c] * com[c, 2]
+        mass[k] = mk
+        if mk > 0.0:
+            com[k, 0] = cx / mk
+            com[k, 1] = cy / mk
+            com[k, 2] = cz / mk
+        else:
+            com[k, 0] = center[k, 0]
+            com[k, 1] = center[k, 1]
+            com[k, 2] = center[k, 2]
+    return child[:count], body[:count], next_body, center[:count], half[:count], mass, com
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _traverse(G, m, r, eps2, theta, child, body, next_body, center, half, mass, com):
+    n = r.shape[0]
+    a = np.zeros((n, 3))
+    theta2 = theta * theta
+    for i in prange(n):
+        xi = r[i, 0]
+        yi = r[i, 1]
+        zi = r[i, 2]
+        ax = 0.0
+        ay = 0.0
+        az = 0.0
+        stack = np.empty(8 * (_MAX_DEPTH + 2), dtype=np.int64)
+        stack[0] = 0
+        sp = 1
+        while sp > 0:
+            sp -= 1
+            k = stack[sp]
+            if body[k] >= 0:
+                # leaf: exact pairwise terms
+                j = body[k]
+                while j >= 0:
+                    if j != i:
+                        dx = r[j, 0] - xi
+                        dy = r[j, 1] - yi
+                        dz = r[j, 2] - zi
+                        inv_r = 1.0 / math.sqrt(dx * dx + dy * dy + dz * dz + eps2)
+                        f = m[j] * inv_r * inv_r * inv_r
+                        ax += f * dx
+                        ay += f * dy
+                        az += f * dz
+                    j = next_body[j]
+                continue
+            dx = com[k, 0] - xi
+            dy = com[k, 1] - yi
+            dz = com[k, 2] - zi
+            d2 = dx * dx + dy * dy + dz * dz
+            w = 2.0 * half[k]
+            h = half[k]
+            inside = (abs(xi - center[k, 0]) <= h and abs(yi - center[k, 1]) <= h
+                      and abs(zi - center[k, 2]) <= h)
+            if not inside and w * w < theta2 * d2:
+                # far enough: the whole cell acts as one pseudo-particle at its COM
+                inv_r = 1.0 / math.sqrt(d2 + eps2)
+                f = mass[k] * inv_r * inv_r * inv_r
+                ax += f * dx
+                ay += f * dy
+                az += f * dz
+            else:
+                for o in range(8):
+                    c = child[k, o]
+                    if c >= 0:
+                        stack[sp] = c
+                        sp += 1
+        a[i, 0] = G * ax
+        a[i, 1] = G * ay
+        a[i, 2] = G * az
+    return a
+
+def accels_barnes_hut(G: float, m: np.ndarray, r: np.ndarray, eps2: float, theta: float = 0.5) -> np.ndarray:
+    """
+    Approximate gravitational accelerations with a Barnes-Hut octree.
+    A cell of width w at distance d from a body is used as a single
+    pseudo-particle when w/d < theta; theta=0 opens every cell (exact sum).
+    """
+    m = np.ascontiguousarray(m, dtype=np.float64)
+    r = np.ascontiguousarray(r, dtype=np.float64)
+    if r.shape[0] == 0:
+        return np.zeros_like(r)
+    tree = _build_octree(m, r)
+    return _traverse(float(G), m, r, float(eps2), float(theta), *tree)
@@ -1,8 +1,17 @@
 from __future__ import annotations
+import math
+import warnings
 import numpy as np
-from typing import Dict, Any
+from numpy.typing import DTypeLike
+from typing import Dict, Any, Optional
 
 from ..models import LawCard
+from .._jit import HAVE_NUMBA
+from .barnes_hut import accels_barnes_hut
+from .verlet_nb import _accels_loop_nb, _verlet_run_nb
+
+_PANEL_BYTES = 1 << 20
+_MIN_PANEL_ROWS = 8
 
 class VerletNBodySolver:
     """
@@ -13,9 +22,17 @@ class VerletNBodySolver:
 
     Params:
       softening: Plummer-like softening length (meters). 0.0 = none.
-      vectorized: allow O(N^2) vectorized accelerations when feasible.
+      vectorized: allow the NumPy vectorized O(N^2) kernel (used without numba).
       vectorize_threshold: minimum N to switch to vectorized path.
-      max_vectorized_bytes: cap memory the vectorized kernels are allowed to allocate.
+      max_vectorized_bytes: cap on the scratch memory of one vectorized panel.
+      theta: Barnes-Hut opening angle; smaller is more accurate, 0.0 = exact.
+      tree_threshold: minimum N to switch to the Barnes-Hut tree (needs numba). The
+        tree only overtakes the compiled direct sum at N ~ 8k (single core, theta=0.5);
+        the default leaves a margin since more cores favour the direct sum.
+      kernel_dtype: float dtype of the vectorized kernel's pairwise grids. float32
+        halves their memory traffic at ~1e-7 relative force error; the state
+        itself always stays float64. Like vectorize_threshold and
+        max_vectorized_bytes it has no effect when numba is installed.
     """
 
     def __init__(
@@ -24,51 +41,161 @@ class VerletNBodySolver:
         vectorized: bool = True,
         vectorize_threshold: int = 64,
         max_vectorized_bytes: int = 256_000_000,  # ~256MB
+        theta: float = 0.5,
+        tree_threshold: int = 16384,
+        kernel_dtype: DTypeLike = np.float64,
     ):
         self.softening = float(softening)
         self.vectorized = bool(vectorized)
         self.vectorize_threshold = int(vectorize_threshold)
         self.max_vectorized_bytes = int(max_vectorized_bytes)
+        self.theta = float(theta)
+        self.tree_threshold = int(tree_threshold)
+        self.kernel_dtype = np.dtype(kernel_dtype).type
+        if HAVE_NUMBA and self.kernel_dtype is not np.float64:
+            # the compiled kernels replace the vectorized one and always run in float64
+            warnings.warn(
+                "kernel_dtype only applies to the NumPy vectorized kernel, which is not "
+                "used when numba is installed; forces are computed in float64",
+                stacklevel=2,
+            )
 
     # ---------- acceleration kernels ----------
 
     @staticmethod
-    def _accels_loop(G: float, m: np.ndarray, r: np.ndarray, eps2: float) -> np.ndarray:
+    def _accels_loop(
+        G: float, m: np.ndarray, r: np.ndarray, eps2: float, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        if HAVE_NUMBA:
+            r = np.ascontiguousarray(r, dtype=np.float64)
+            if out is None:
+                out = np.empty_like(r)
+            return _accels_loop_nb(float(G), np.ascontiguousarray(m, dtype=np.float64), r, float(eps2), out)
         n = r.shape[0]
-        a = np.zeros_like(r)
+        a = np.zeros_like(r) if out is None else out
         for i in range(n):
-            dr = r[i] - r
+            dr = r - r[i]                        # r_j - r_i; the self row is exactly 0
             dist2 = np.sum(dr * dr, axis=1) + eps2
-            dist2[i] = np.inf  # avoid self singularity BEFORE division
-            inv_r3 = 1.0 / np.power(dist2, 1.5)
-            a[i] = -G * (dr * (m * inv_r3)[:, None]).sum(axis=0)
+            dist2[i] = 1.0  # finite placeholder: keeps the self term 0 * w, no 0/0
+            w = m / (dist2 * np.sqrt(dist2))     # m_j / d^3
+            a[i] = G * (dr * w[:, None]).sum(axis=0)
+        return a
+
+    @staticmethod
+    def _accels_vectorized(
+        G: float,
+        m: np.ndarray,
+        r: np.ndarray,
+        eps2: float,
+        dtype: DTypeLike = np.float64,
+        panel_rows: int | None = None,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        n = r.shape[0]
+        scale = G
+        if np.dtype(dtype) != np.float64:
+            # Centre and normalise (as in potential_energy) so d^3 and the masses
+            # stay inside float32 range, then scale back in float64.
+            r = r - r.mean(axis=0)
+            L = float(np.abs(r).max()) or 1.0
+            M = float(np.abs(m).max()) or 1.0
+            r = r / L
+            m = m / M
+            eps2 = eps2 / (L * L)
+            scale = G * M / (L * L)
+        # SoA: one grid per axis instead of a stacked (N,N,3) tensor
+        rx = r[:, 0].astype(dtype)
+        ry = r[:, 1].astype(dtype)
+        rz = r[:, 2].astype(dtype)
+        mj = m.astype(dtype)[None, :]
+        B = n if panel_rows is None else max(1, min(int(panel_rows), n))
+        a = np.empty((n, 3)) if out is None else out
+        # The five (B,N) grids are allocated once per call and every panel writes
+        # into them with out=, so there are no per-panel temporaries.
+        dxs, dys, dzs, d2s, ws = np.empty((5, B, n), dtype=dtype)
+        # Panels of B rows (targets i) against all N sources j, so the five (B,N)
+        # grids stay cache-resident instead of streaming (N,N) through DRAM.
+        for i0 in range(0, n, B):
+            i1 = min(i0 + B, n)
+            b = i1 - i0
+            dx = dxs[:b]
+            dy = dys[:b]
+            dz = dzs[:b]
+            dist2 = d2s[:b]
+            w = ws[:b]
+            np.subtract(rx[None, :], rx[i0:i1, None], out=dx)    # r_j - r_i
+            np.subtract(ry[None, :], ry[i0:i1, None], out=dy)
+            np.subtract(rz[None, :], rz[i0:i1, None], out=dz)
+            np.multiply(dx, dx, out=dist2)
+            np.multiply(dy, dy, out=w)
+            dist2 += w
+            np.multiply(dz, dz, out=w)
+            dist2 += w
+            dist2 += eps2
+            k = np.arange(b)
+            # panel's diagonal: dx = dy = dz = 0 exactly, so any finite d2 zeroes the
+            # self term; 1.0 avoids the 0/0 at eps2 = 0
+            dist2[k, i0 + k] = 1.0
+            # m_j / d^3 as m_j / (d2 * sqrt(d2)): one sqrt and one divide per pair
+            # instead of pow(d2, 1.5) followed by a reciprocal
+            np.sqrt(dist2, out=w)
+            w *= dist2
+            np.divide(mj, w, out=w)
+            a[i0:i1, 0] = np.einsum("ij,ij->i", w, dx)
+            a[i0:i1, 1] = np.einsum("ij,ij->i", w, dy)
+            a[i0:i1, 2] = np.einsum("ij,ij->i", w, dz)
+        a *= scale
         return a
 
     @staticmethod
-    def _accels_vectorized(G: float, m: np.ndarray, r: np.ndarray, eps2: float) -> np.ndarray:
-        # Pairwise differences: (N,N,3)
-        diff = r[:, None, :] - r[None, :, :]
-        # Squared distances: (N,N)
-        dist2 = np.einsum("ijk,ijk->ij", diff, diff) + eps2
-        np.fill_diagonal(dist2, np.inf)           # avoid self division
-        inv_r3 = 1.0 / np.power(dist2, 1.5)       # (N,N)
-        # Broadcast masses on j-index then sum over j
-        return -G * (diff * (m[None, :] * inv_r3)[:, :, None]).sum(axis=1)
+    def _accels_two_body(G: float, m: np.ndarray, r: np.ndarray, eps2: float) -> np.ndarray:
+        # N == 2: a single pair in Python floats, no O(N^2) array machinery
+        (x0, y0, z0), (x1, y1, z1) = r.tolist()
+        dx = x1 - x0
+        dy = y1 - y0
+        dz = z1 - z0
+        d2 = dx * dx + dy * dy + dz * dz + eps2
+        if d2 == 0.0:
+            # coincident bodies without softening: NaN with a RuntimeWarning, like the
+            # N-body kernels, instead of a ZeroDivisionError
+            return VerletNBodySolver._accels_vectorized(G, m, r, eps2)
+        inv_r3 = G / (d2 * math.sqrt(d2))
+        f0 = float(m[1]) * inv_r3
+        f1 = -float(m[0]) * inv_r3
+        return np.array([[f0 * dx, f0 * dy, f0 * dz], [f1 * dx, f1 * dy, f1 * dz]])
+
+    @staticmethod
+    def _accels_bh(G: float, m: np.ndarray, r: np.ndarray, eps2: float, theta: float) -> np.ndarray:
+        # O(N log N) approximation; see barnes_hut.py
+        return accels_barnes_hut(G, m, r, eps2, theta)
+
+    def _use_tree(self, n: int) -> bool:
+        # The tree walk is only worth it compiled; in plain Python the O(N^2)
+        # NumPy kernels stay faster for any N we can afford to run.
+        return HAVE_NUMBA and self.theta > 0.0 and n >= self.tree_threshold
 
     def _should_vectorize(self, n: int) -> bool:
-        if not self.vectorized or n < self.vectorize_threshold:
-            return False
-        # Rough memory estimate: diff(N,N,3) + dist2(N,N) + inv_r3(N,N) ~ 48*N^2 bytes
-        estimated = 48 * (n ** 2)
-        return estimated < self.max_vectorized_bytes
+        # The compiled loop beats the NumPy grids at every N, so they are only the
+        # fallback when numba is missing.
+        return self.vectorized and not HAVE_NUMBA and n >= self.vectorize_threshold
+
+    def _panel_rows(self, n: int) -> int:
+        # Five (B,N) grids per panel: size B for ~1 MiB (about an L2) and never more
+        # than max_vectorized_bytes.
+        per_row = 5 * np.dtype(self.kernel_dtype).itemsize * n
+        budget = min(_PANEL_BYTES, self.max_vectorized_bytes)
+        return max(_MIN_PANEL_ROWS, budget // per_row)
 
     # NEW: expose accelerations so the integrator can add other laws
-    def accelerations(self, state: Dict[str, Any], lawcard: LawCard) -> np.ndarray:
+    def accelerations(
+        self, state: Dict[str, Any], lawcard: LawCard, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        # `out`: optional (N,3) float64 buffer to write into (and return)
         r = state["r"]
         m = state["m"]
         G = lawcard.parameters["G"].value
         eps2 = self.softening**2
-        return self._accels(G, m, r, eps2)
+        return self._accels(G, m, r, eps2, out)
 
     # ---------- time step ----------
 
@@ -91,7 +218,8 @@ class VerletNBodySolver:
         if vectorized:
             a_new = VerletNBodySolver._accels_vectorized(G, m, r_new, eps2)
         else:
-            a_new = VerletNBodySolver._accels_loop(G, m, r_new, eps2)
+            # `a` is already folded into v_half, so its buffer can be reused
+            a_new = VerletNBodySolver._accels_loop(G, m, r_new, eps2, out=a)
         v_new = v_half + 0.5 * dt_seconds * a_new
         return r_new, v_new
 
@@ -107,9 +235,63 @@ class VerletNBodySolver:
         v_new = v_half + 0.5 * dt_seconds * a_new
         return {"t": t + dt_seconds, "r": r_new, "v": v_new, "m": m}
 
-    def _accels(self, G: float, m: np.ndarray, r: np.ndarray, eps2: float) -> np.ndarray:
+    def step_many(
+        self,
+        state: Dict[str, Any],
+        lawcard: LawCard,
+        dt_seconds: float,
+        steps: int,
+        lin_drag: Optional[np.ndarray] = None,
+        quad_drag: Optional[np.ndarray] = None,
+        accels: Optional[np.ndarray] = None,
+    ) -> Dict[str, Any]:
+        """
+        Advance `steps` kick-drift-kick steps in one call; with numba the whole loop
+        runs compiled (the first call compiles for several seconds, later runs load
+        the on-disk cache). The input state is not modified.
+
+        lin_drag / quad_drag: optional per-body (N,) coefficients c adding c*v and
+        c*|v|*v to the accelerations (c = -gamma/m and -Cq/m for drag).
+        accels: gravity at state["r"] if the caller already has it, e.g. the "a" entry
+        (gravity at the returned r) of a previous step_many result.
+        """
+        m = np.ascontiguousarray(state["m"], dtype=np.float64)
+        G = float(lawcard.parameters["G"].value)
+        eps2 = self.softening**2
+        n = m.shape[0]
+        r = np.array(state["r"], dtype=np.float64)
+        v = np.array(state["v"], dtype=np.float64)
+        a = self.accelerations(state, lawcard) if accels is None else np.array(accels, dtype=np.float64)
+        lin = np.zeros(n) if lin_drag is None else np.ascontiguousarray(lin_drag, dtype=np.float64)
+        quad = np.zeros(n) if quad_drag is None else np.ascontiguousarray(quad_drag, dtype=np.float64)
+        if HAVE_NUMBA:
+            _verlet_run_nb(G, m, r, v, a, float(dt_seconds), int(steps), eps2, lin, quad,
+                           self.theta, self._use_tree(n))
+        else:
+            h = 0.5 * dt_seconds
+            lin = lin[:, None]
+            quad = quad[:, None]
+            for _ in range(steps):
+                v += h * (a + (lin + quad * np.linalg.norm(v, axis=1)[:, None]) * v)
+                r += dt_seconds * v
+                a = self._accels(G, m, r, eps2, a)
+                v += h * (a + (lin + quad * np.linalg.norm(v, axis=1)[:, None]) * v)
+        return {"t": state.get("t", 0.0) + steps * dt_seconds, "r": r, "v": v, "m": m, "a": a}
+
+    def _accels(
+        self, G: float, m: np.ndarray, r: np.ndarray, eps2: float, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         n = r.shape[0]
-        if self._should_vectorize(n):
-            return self._accels_vectorized(G, m, r, eps2)
+        if n == 2:
+            a = self._accels_two_body(G, m, r, eps2)
+        elif self._use_tree(n):
+            a = self._accels_bh(G, m, r, eps2, self.theta)
+        elif self._should_vectorize(n):
+            return self._accels_vectorized(G, m, r, eps2, self.kernel_dtype, self._panel_rows(n), out)
         else:
-            return self._accels_loop(G, m, r, eps2)
\ No newline at end of file
+            return self._accels_loop(G, m, r, eps2, out)
+        # the two-body and tree kernels build their own array
+        if out is None:
+            return a
+        out[...] = a
+        return out
\ No newline at end of file
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from .._jit import njit, prange
+from .barnes_hut import _build_octree, _traverse
+
+# Compiled kernels for VerletNBodySolver. Only called when numba is installed; the
+# solver keeps NumPy fallbacks for everything here.
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _accels_loop_nb(G, m, r, eps2, out):
+    # Each i streams over unit-stride per-axis copies of the positions, and the
+    # self term is masked with a select rather than a branch, so LLVM vectorizes
+    # the j loop (several j per SIMD lane group, sqrt/div in vector registers).
+    n = r.shape[0]
+    rx = r[:, 0].copy()
+    ry = r[:, 1].copy()
+    rz = r[:, 2].copy()
+    for i in prange(n):
+        xi = rx[i]
+        yi = ry[i]
+        zi = rz[i]
+        ax = 0.0
+        ay = 0.0
+        az = 0.0
+        for j in range(n):
+            dx = rx[j] - xi
+            dy = ry[j] - yi
+            dz = rz[j] - zi
+            d2 = dx * dx + dy * dy + dz * dz + eps2
+            f = 0.0 if j == i else m[j] / (d2 * math.sqrt(d2))
+            ax += f * dx
+            ay += f * dy
+            az += f * dz
+        out[i, 0] = G * ax
+        out[i, 1] = G * ay
+        out[i, 2] = G * az
+    return out
+
+@njit(fastmath=True, cache=True)
+def _accels_two_body_nb(G, m, r, eps2, out):
+    # N == 2 without the parallel region: a thread-pool launch per step would cost
+    # more than the single pair
+    dx = r[1, 0] - r[0, 0]
+    dy = r[1, 1] - r[0, 1]
+    dz = r[1, 2] - r[0, 2]
+    d2 = dx * dx + dy * dy + dz * dz + eps2
+    if d2 == 0.0:
+        # coincident bodies without softening: NaN as in _accels_loop_nb, not a
+        # ZeroDivisionError
+        out[:, :] = np.nan
+        return out
+    inv_r3 = G / (d2 * math.sqrt(d2))
+    f0 = m[1] * inv_r3
+    f1 = -m[0] * inv_r3
+    out[0, 0] = f0 * dx
+    out[0, 1] = f0 * dy
+    out[0, 2] = f0 * dz
+    out[1, 0] = f1 * dx
+    out[1, 1] = f1 * dy
+    out[1, 2] = f1 * dz
+    return out
+
+@njit(fastmath=True, cache=True)
+def _kick(v, a, lin, quad, h):
+    # v += h * (a + drag), drag = lin*v + quad*|v|*v per body
+    for i in range(v.shape[0]):
+        vx = v[i, 0]
+        vy = v[i, 1]
+        vz = v[i, 2]
+        c = lin[i]
+        if quad[i] != 0.0:
+            c += quad[i] * math.sqrt(vx * vx + vy * vy + vz * vz)
+        v[i, 0] = vx + h * (a[i, 0] + c * vx)
+        v[i, 1] = vy + h * (a[i, 1] + c * vy)
+        v[i, 2] = vz + h * (a[i, 2] + c * vz)
+
+@njit(fastmath=True, cache=True)
+def _verlet_run_nb(G, m, r, v, a, dt, steps, eps2, lin, quad, theta, use_tree):
+    # `steps` kick-drift-kick steps in place on r, v, a; `a` holds gravity at r on
+    # entry and on exit.
+    h = 0.5 * dt
+    n = r.shape[0]
+    for _ in range(steps):
+        _kick(v, a, lin, quad, h)
+        for i in range(n):
+            r[i, 0] += dt * v[i, 0]
+            r[i, 1] += dt * v[i, 1]
+            r[i, 2] += dt * v[i, 2]
+        if n == 2:
+            _accels_two_body_nb(G, m, r, eps2, a)
+        elif use_tree:
+            child, body, next_body, center, half, mass, com = _build_octree(m, r)
+            a[:, :] = _traverse(G, m, r, eps2, theta, child, body, next_body, center, half, mass, com)
+        else:
+            _accels_loop_nb(G, m, r, eps2, a)
+        _kick(v, a, lin, quad, h)
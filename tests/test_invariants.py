@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from worldsim_core.invariants import (
+    angular_momentum,
+    audit_invariants,
+    kinetic_energy,
+    linear_momentum,
+    potential_energy,
+    rel_drift,
+)
+
+
+def _pe_reference(G, m, r):
+    pe = 0.0
+    for i in range(len(m)):
+        for j in range(i + 1, len(m)):
+            pe -= G * m[i] * m[j] / np.linalg.norm(r[i] - r[j])
+    return pe
+
+@pytest.mark.parametrize("n", [30, 150])  # pair-vector path and tiled path
+def test_potential_energy_matches_pairwise_sum(n):
+    rng = np.random.default_rng(7)
+    m = rng.uniform(1.0, 5.0, n)
+    r = rng.normal(size=(n, 3)) * 1e3
+    assert np.isclose(potential_energy(6.674e-11, m, r), _pe_reference(6.674e-11, m, r), rtol=1e-12)
+
+def test_potential_energy_far_from_origin():
+    # tight pair 1 AU out: separation is 1e-8 of |r|
+    m = np.array([2.0, 3.0])
+    r = np.array([[1.496e11, 0.0, 0.0], [1.496e11 + 1e3, 0.0, 0.0]])
+    assert np.isclose(potential_energy(1.0, m, r), -6.0 / 1e3, rtol=1e-6)
+
+def test_audit_invariants_matches_helpers():
+    rng = np.random.default_rng(3)
+    m = rng.uniform(1.0, 5.0, 25)
+    r = rng.normal(size=(25, 3))
+    v = rng.normal(size=(25, 3))
+    inv = audit_invariants(2.0, m, r, v)
+    assert np.isclose(inv["Energy"], kinetic_energy(m, v) + potential_energy(2.0, m, r), rtol=1e-12)
+    assert np.allclose(inv["LinearMomentum"], linear_momentum(m, v), rtol=1e-12)
+    assert np.allclose(inv["AngularMomentum"], angular_momentum(m, r, v), rtol=1e-12)
+
+def test_angular_momentum_matches_cross_product():
+    rng = np.random.default_rng(11)
+    m = rng.uniform(1.0, 5.0, 30)
+    r = rng.normal(size=(30, 3))
+    v = rng.normal(size=(30, 3))
+    expected = np.cross(r, m[:, None] * v, axis=1).sum(axis=0)
+    assert np.allclose(angular_momentum(m, r, v), expected, rtol=1e-12)
+
+def test_rel_drift_scalars_and_vectors():
+    assert rel_drift(-1.1, -1.0) == pytest.approx(0.1)
+    assert rel_drift(np.array([3.0, 4.0, 0.0]), np.array([0.0, 0.0, 10.0])) == pytest.approx(0.5)
+    assert rel_drift(np.zeros(3), np.zeros(3)) == 0.0
+
+def test_potential_energy_float32_close_for_stellar_masses():
+    rng = np.random.default_rng(5)
+    m = rng.uniform(1e29, 2e30, 100)   # m_i*m_j overflows float32 unless normalised
+    r = rng.normal(size=(100, 3)) * 1e12 + 1e13
+    pe64 = potential_energy(6.674e-11, m, r)
+    pe32 = potential_energy(6.674e-11, m, r, dtype=np.float32)
+    assert np.isfinite(pe32)
+    assert abs(pe32 - pe64) <= 1e-5 * abs(pe64)
+
+def test_audit_invariants_want_subset():
+    rng = np.random.default_rng(2)
+    m = rng.uniform(1.0, 5.0, 20)
+    r = rng.normal(size=(20, 3))
+    v = rng.normal(size=(20, 3))
+    full = audit_invariants(1.0, m, r, v)
+    part = audit_invariants(1.0, m, r, v, want={"LinearMomentum"})
+    assert set(part) == {"LinearMomentum"}
+    assert np.allclose(part["LinearMomentum"], full["LinearMomentum"], rtol=1e-12)
@@ -0,0 +1,20 @@
+import json
+
+from worldsim_core import _json
+
+
+def test_read_json_large_file_matches_stdlib(tmp_path, monkeypatch):
+    payload = {
+        "title": "Schrödinger",
+        "rows": [{"i": i, "x": i * 0.1, "tag": f"row-{i}", "ok": i % 2 == 0} for i in range(4000)],
+    }
+    path = tmp_path / "big.json"
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    assert path.stat().st_size >= _json._MMAP_MIN_BYTES
+
+    maps = []
+    real = _json.mmap.mmap
+    monkeypatch.setattr(_json.mmap, "mmap", lambda *a, **k: maps.append(a) or real(*a, **k))
+    assert _json.read_json(path) == json.loads(path.read_text(encoding="utf-8"))
+    # memory-mapped only when orjson can parse the mapping in place
+    assert len(maps) == (1 if _json.HAVE_ORJSON else 0)
@@ -0,0 +1,24 @@
+import json
+from datetime import datetime
+
+from worldsim_core.provenance import write_lockfile
+from worldsim_core.simulate import RunResult
+
+
+def _run():
+    return RunResult(steps=10, dt_seconds=60.0, final_state={}, initial_invariants={},
+                     final_invariants={}, drifts={"Energy": 1e-15})
+
+def test_lockfile_indented_by_default(tmp_path):
+    path = write_lockfile(_run(), {}, tmp_path / "run.lock.json")
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith('{\n  "generatedAt"')
+    data = json.loads(text)
+    assert datetime.fromisoformat(data["generatedAt"]).utcoffset().total_seconds() == 0
+    assert data["steps"] == 10 and data["drifts"]["Energy"] == 1e-15
+
+def test_lockfile_compact(tmp_path):
+    path = write_lockfile(_run(), {}, tmp_path / "run.lock.json", compact=True)
+    text = path.read_text(encoding="utf-8")
+    assert "\n" not in text and ": " not in text
+    assert json.loads(text)["dtSeconds"] == 60.0
@@ -0,0 +1,171 @@
+import hashlib
+import json
+
+import pytest
+
+from worldsim_core.resolver import _canonical_sha256, resolve_cards
+
+REF = "rg:law/test.spring.v1"
+
+def _write_card(path, k=1.0, **extra):
+    card = {
+        "id": REF, "version": "1.0.0", "type": "rg:LawCard", "title": "Test spring",
+        "kind": ["dynamics"], "equations": [{"name": "hooke"}],
+        "parameters": {"k": {"value": k, "unit": "unit:N-PER-M"}},
+        "validity": {}, "invariants": {},
+    }
+    card.update(extra)
+    card["sha256"] = _canonical_sha256(card)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(card), encoding="utf-8")
+
+@pytest.fixture
+def card_env(tmp_path, monkeypatch):
+    cards = tmp_path / "cards"
+    cache = tmp_path / "cache" / "cards_index.json"
+    monkeypatch.setenv("RULEGRAPH_CARD_PATHS", str(cards))
+    monkeypatch.setenv("RULEGRAPH_CARD_CACHE", str(cache))
+    return cards, cache
+
+def test_resolve_by_id_writes_id_cache(card_env):
+    cards, cache = card_env
+    _write_card(cards / "physics" / "spring.json")
+    (cards / "other.json").write_text(json.dumps({"id": "rg:law/other.v1"}), encoding="utf-8")
+
+    out = resolve_cards([REF])
+    assert out[REF].parameters["k"].value == 1.0
+    entries = json.loads(cache.read_text(encoding="utf-8"))
+    assert {e["id"] for e in entries.values()} >= {REF}
+
+def test_edited_card_is_reloaded(card_env):
+    cards, _ = card_env
+    path = cards / "spring.json"
+    _write_card(path, k=1.0)
+    assert resolve_cards([REF])[REF].parameters["k"].value == 1.0
+    _write_card(path, k=2.5, title="Test spring (stiffer)")
+    assert resolve_cards([REF])[REF].parameters["k"].value == 2.5
+
+def test_resolved_cards_are_independent_copies(card_env):
+    cards, _ = card_env
+    _write_card(cards / "spring.json")
+    first = resolve_cards([REF])[REF]
+    first.parameters["k"].value = 99.0
+    assert resolve_cards([REF])[REF].parameters["k"].value == 1.0
+
+def test_cache_can_be_disabled(card_env, monkeypatch):
+    cards, cache = card_env
+    monkeypatch.setenv("RULEGRAPH_CARD_CACHE", "")
+    _write_card(cards / "spring.json")
+    assert REF in resolve_cards([REF])
+    assert not cache.exists()
+
+def test_card_added_after_first_scan_is_found(card_env):
+    cards, _ = card_env
+    (cards / "other.json").parent.mkdir(parents=True, exist_ok=True)
+    (cards / "other.json").write_text(json.dumps({"id": "rg:law/other.v1"}), encoding="utf-8")
+    with pytest.raises(FileNotFoundError):
+        resolve_cards([REF])
+    _write_card(cards / "late" / "spring.json")
+    assert REF in resolve_cards([REF])
+
+def test_canonical_hash_form_is_stable():
+    # digests of published cards depend on these exact bytes
+    payload = {"title": "Schrödinger", "b": 1e-05, "a": [1, 2.0], "sha256": "ignored"}
+    blob = b'{"a":[1,2.0],"b":1e-05,"title":"Schr\\u00f6dinger"}'
+    assert _canonical_sha256(payload) == hashlib.sha256(blob).hexdigest()
+
+def test_cold_resolution_reads_each_file_once(card_env, monkeypatch):
+    from worldsim_core import _json
+    cards, _ = card_env
+    _write_card(cards / "spring.json")
+    (cards / "other.json").write_text(json.dumps({"id": "rg:law/other.v1"}), encoding="utf-8")
+    reads = []
+    real = _json.read_json_stat
+    monkeypatch.setattr(_json, "read_json_stat", lambda p: reads.append(p.name) or real(p))
+    assert REF in resolve_cards([REF])
+    assert sorted(reads) == ["other.json", "spring.json"]
+
+def test_verified_digest_is_reused_across_processes(card_env, monkeypatch):
+    from worldsim_core import resolver
+    cards, _ = card_env
+    _write_card(cards / "spring.json")
+    assert REF in resolve_cards([REF])
+
+    # fresh process state: no in-memory caches, only the disk cache survives
+    resolver._load_lawcard_cached.cache_clear()
+    monkeypatch.setattr(resolver, "_DIR_INDEX", None)
+    monkeypatch.setattr(resolver, "_DISK_CACHE", None)
+    calls = []
+    real = resolver._canonical_sha256
+    monkeypatch.setattr(resolver, "_canonical_sha256", lambda d: calls.append(1) or real(d))
+    assert REF in resolve_cards([REF])
+    assert calls == []
+
+    _write_card(cards / "spring.json", k=3.0, title="Test spring (edited)")
+    assert resolve_cards([REF])[REF].parameters["k"].value == 3.0
+    assert len(calls) == 1
+
+def test_digest_not_recorded_for_card_rewritten_during_verification(card_env, monkeypatch):
+    from worldsim_core import resolver
+    cards, _ = card_env
+    path = cards / "spring.json"
+    _write_card(path)
+    genuine = json.loads(path.read_text(encoding="utf-8"))
+
+    # the file is rewritten (keeping the declared digest) while it is being hashed
+    real = resolver._canonical_sha256
+    def hash_then_tamper(d):
+        tampered = json.loads(json.dumps(genuine))
+        tampered["parameters"]["k"]["value"] = 666.0
+        path.write_text(json.dumps(tampered), encoding="utf-8")
+        return real(d)
+    monkeypatch.setattr(resolver, "_canonical_sha256", hash_then_tamper)
+    assert resolve_cards([REF])[REF].parameters["k"].value == 1.0
+
+    # a fresh process must hash the tampered bytes and reject them
+    monkeypatch.setattr(resolver, "_canonical_sha256", real)
+    resolver._load_lawcard_cached.cache_clear()
+    monkeypatch.setattr(resolver, "_DIR_INDEX", None)
+    monkeypatch.setattr(resolver, "_DISK_CACHE", None)
+    with pytest.raises(ValueError, match="sha256 mismatch"):
+        resolve_cards([REF])
+
+def test_same_size_edit_with_restored_mtime_is_reloaded(card_env):
+    import os
+    import time
+    cards, _ = card_env
+    path = cards / "spring.json"
+    _write_card(path, k=1.0)
+    assert resolve_cards([str(path)])[REF].parameters["k"].value == 1.0
+    before = path.stat()
+    time.sleep(0.05)   # let the ctime clock tick
+    _write_card(path, k=2.0)   # same length as k=1.0
+    os.utime(path, ns=(before.st_atime_ns, before.st_mtime_ns))
+    assert path.stat().st_size == before.st_size
+    assert resolve_cards([str(path)])[REF].parameters["k"].value == 2.0
+
+def test_rescan_drops_deleted_files_from_cache(card_env, monkeypatch):
+    from worldsim_core import resolver
+    cards, cache = card_env
+    _write_card(cards / "spring.json")
+    gone = cards / "old.json"
+    gone.write_text(json.dumps({"id": "rg:law/old.v1"}), encoding="utf-8")
+    assert REF in resolve_cards([REF])
+    assert str(gone) in json.loads(cache.read_text(encoding="utf-8"))
+
+    gone.unlink()
+    monkeypatch.setattr(resolver, "_DIR_INDEX", None)
+    assert REF in resolve_cards([REF])
+    entries = json.loads(cache.read_text(encoding="utf-8"))
+    assert str(gone) not in entries
+    assert str(cards / "spring.json") in entries
+
+def test_large_library_scan(card_env):
+    cards, cache = card_env
+    for k in range(40):  # enough files for the threaded read path
+        path = cards / f"lib{k % 4}" / f"card{k}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"id": f"rg:law/filler.{k}.v1"}), encoding="utf-8")
+    _write_card(cards / "lib3" / "spring.json")
+    assert REF in resolve_cards([REF])
+    assert len(json.loads(cache.read_text(encoding="utf-8"))) == 41
@@ -0,0 +1,120 @@
+import copy
+import json
+from pathlib import Path
+
+import numpy as np
+
+from worldsim_core.models import World
+from worldsim_core.resolver import resolve_cards
+from worldsim_core.simulate import SolverRegistry, simulate
+from worldsim_core.solvers import VerletNBodySolver
+
+EX = Path(__file__).resolve().parents[1] / "examples" / "data"
+
+def _world(name, positions, velocities, masses):
+    w = World(**json.loads((EX / "worlds" / name).read_text()))
+    template = w.entities[0]
+    w.entities = []
+    for i, (p, v, mass) in enumerate(zip(positions, velocities, masses)):
+        e = copy.deepcopy(template)
+        e.id = f"rg:body/b{i}"
+        e.mass.value = float(mass)
+        e.state.position.value = [float(x) for x in p]
+        e.state.velocity.value = [float(x) for x in v]
+        w.entities.append(e)
+    w.config = dict(w.config or {})
+    return w
+
+class _UniformFieldSolver(VerletNBodySolver):
+    # gravity plus a constant +1 m/s^2 along x
+    def accelerations(self, state, lawcard, out=None):
+        a = super().accelerations(state, lawcard, out)
+        a[:, 0] += 1.0
+        return a
+
+def test_solver_subclass_overrides_are_used():
+    # two 1 kg bodies far apart: gravity is negligible next to the added field
+    w = _world("two-body.demo.json", [[0, 0, 0], [0, 1e6, 0]], [[0, 0, 0]] * 2, [1.0, 1.0])
+    w.config["dtSeconds"] = 1.0
+    w.config["steps"] = 10
+    cards = resolve_cards([w.dynamics[0]["ref"]])
+    registry = SolverRegistry()
+    registry.register("rg:law/physics.gravity.newton.v1", _UniformFieldSolver())
+    run = simulate(w, cards, registry=registry, write_back=False)
+    # x = a t^2 / 2 after 10 s
+    assert np.allclose(run.final_state["r"][:, 0], 50.0, rtol=1e-9)
+
+def _reference_run(G, m, r, v, dt, steps, terms):
+    # the pre-optimisation loop: gravity twice per step, drag applied through masks
+    r = r.copy()
+    v = v.copy()
+
+    def accel(r, v):
+        d = r[None, :, :] - r[:, None, :]
+        dist2 = np.einsum("ijk,ijk->ij", d, d)
+        np.fill_diagonal(dist2, np.inf)
+        a = G * np.einsum("ij,ijk->ik", m[None, :] / dist2**1.5, d)
+        for kind, mask, c in terms:
+            scale = c / m[mask] if kind == "linear" else c / m[mask] * np.linalg.norm(v[mask], axis=1)
+            a[mask] -= scale[:, None] * v[mask]
+        return a
+
+    for _ in range(steps):
+        v_half = v + 0.5 * dt * accel(r, v)
+        r = r + dt * v_half
+        v = v_half + 0.5 * dt * accel(r, v_half)
+    return r, v
+
+def test_gravity_with_overlapping_drag_matches_reference():
+    # 100 bodies on a 5x5x4 lattice with jittered velocities
+    rng = np.random.default_rng(7)
+    n = 100
+    pos = np.stack(np.meshgrid(np.arange(5), np.arange(5), np.arange(4), indexing="ij"), -1)
+    pos = pos.reshape(n, 3) * 100.0
+    vel = rng.normal(size=(n, 3))
+    mass = rng.uniform(1e9, 1e10, n)
+    w = _world("gravity_drag.demo.json", pos, vel, mass)
+    ids = [e.id for e in w.entities]
+    w.dynamics = [
+        World.Dynamic(ref="rg:law/physics.gravity.newton.v1"),
+        # every body (no selector), a partial quadratic set, and a second linear term
+        # overlapping both
+        World.Dynamic(ref="rg:law/fluids.drag.linear.v1", override={"gamma": 1e8}),
+        World.Dynamic(ref="rg:law/fluids.drag.quadratic.v1", selector={"bodies": ids[:40]},
+                      override={"Cq": 1e8}),
+        World.Dynamic(ref="rg:law/fluids.drag.linear.v1", selector={"bodies": ids[30:60]},
+                      override={"gamma": 5e7}),
+    ]
+    w.config["dtSeconds"] = 1.0
+    w.config["steps"] = 50
+    cards = resolve_cards([d.ref for d in w.dynamics])
+    G = cards["rg:law/physics.gravity.newton.v1"].parameters["G"].value
+
+    run = simulate(w, cards, write_back=False)
+    assert run.steps == 50
+
+    everyone = np.ones(n, dtype=bool)
+    first40 = np.arange(n) < 40
+    mid30 = (np.arange(n) >= 30) & (np.arange(n) < 60)
+    terms = [("linear", everyone, 1e8), ("quadratic", first40, 1e8), ("linear", mid30, 5e7)]
+    r_ref, v_ref = _reference_run(G, mass, pos, vel, 1.0, 50, terms)
+    assert np.allclose(run.final_state["r"], r_ref, rtol=1e-12, atol=1e-9)
+    assert np.allclose(run.final_state["v"], v_ref, rtol=1e-12, atol=1e-12)
+
+def test_write_back_updates_entities_only_when_asked():
+    def run(**kwargs):
+        w = World(**json.loads((EX / "worlds" / "two-body.demo.json").read_text()))
+        w.config = dict(w.config or {})
+        w.config["dtSeconds"] = 120.0
+        w.config["steps"] = 10
+        cards = resolve_cards([w.dynamics[0]["ref"]])
+        before = [(list(e.state.position.value), list(e.state.velocity.value)) for e in w.entities]
+        return w, before, simulate(w, cards, **kwargs)
+
+    w, _, res = run()
+    assert [e.state.position.value for e in w.entities] == res.final_state["r"].tolist()
+    assert [e.state.velocity.value for e in w.entities] == res.final_state["v"].tolist()
+
+    w, before, res = run(write_back=False)
+    assert [(e.state.position.value, e.state.velocity.value) for e in w.entities] == before
+    assert res.final_state["r"].tolist() != [p for p, _ in before]
@@ -1,5 +1,6 @@
 from pathlib import Path
 import json
+import pytest
 from worldsim_core.models import World
 from worldsim_core.resolver import resolve_cards
 from worldsim_core.validate import validate
@@ -9,6 +10,7 @@ EX = Path(__file__).resolve().parents[1] / "examples" / "data"
 
 REL_TOL = 5e-5  # 30-day @ 120 s
 
+
 def test_two_body_30day_energy_drift():
     w = World(**json.loads((EX / "worlds" / "two-body.demo.json").read_text()))
     # Configure a 30-day run at 120 s
@@ -20,5 +22,33 @@ def test_two_body_30day_energy_drift():
     rep = validate(w, cards)
     assert rep.ok, f"validation failed: {[ (i.path, i.message) for i in rep.issues ]}"
 
-    run = simulate(w, cards)
-    assert run.drifts["Energy"] < REL_TOL, f"Energy drift {run.drifts['Energy']:.3e} exceeds {REL_TOL}"
\ No newline at end of file
+    run = simulate(w, cards, write_back=False)
+    assert run.drifts["Energy"] < REL_TOL, f"Energy drift {run.drifts['Energy']:.3e} exceeds {REL_TOL}"
+
+
+def test_near_parabolic_run_completes():
+    # Total energy ~0 while |PE| is not: the gross-drift check must not mistake
+    # rounding in the potential for a blow-up and stop the run early.
+    w = World(**json.loads((EX / "worlds" / "two-body.demo.json").read_text()))
+    cards = resolve_cards([w.dynamics[0]["ref"]])
+    G = cards[w.dynamics[0]["ref"]].parameters["G"].value
+    sun, earth = w.entities
+    d = earth.state.position.value[0]
+    v_esc = (2.0 * G * (sun.mass.value + earth.mass.value) / d) ** 0.5
+    earth.state.velocity.value = [0.0, v_esc * (1.0 - 1e-6), 0.0]
+    w.config = dict(w.config or {})
+    w.config["dtSeconds"] = 0.1
+    w.config["steps"] = 1000
+
+    run = simulate(w, cards, write_back=False)
+    assert run.steps == 1000
+
+
+def test_rejects_non_3d_state():
+    w = World(**json.loads((EX / "worlds" / "two-body.demo.json").read_text()))
+    earth = w.entities[1]
+    earth.state.position.value = [149597870000.0, 0.0]
+    earth.state.velocity.value = [0.0, 29780.0, 0.0, 0.0]
+    cards = resolve_cards([w.dynamics[0]["ref"]])
+    with pytest.raises(ValueError, match="3 components"):
+        simulate(w, cards, write_back=False)
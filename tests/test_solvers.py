@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from worldsim_core.solvers import VerletNBodySolver
+from worldsim_core.solvers.barnes_hut import accels_barnes_hut
+
+
+def _cluster(n, seed=1):
+    rng = np.random.default_rng(seed)
+    m = rng.uniform(1.0, 5.0, n)
+    r = rng.normal(size=(n, 3)) * 1e3
+    return m, r
+
+def _direct_reference(G, m, r, eps2):
+    a = np.zeros_like(r)
+    for i in range(len(m)):
+        for j in range(len(m)):
+            if i != j:
+                d = r[j] - r[i]
+                a[i] += G * m[j] * d / (d @ d + eps2) ** 1.5
+    return a
+
+def test_direct_kernels_match_reference():
+    m, r = _cluster(40)
+    expected = _direct_reference(2.0, m, r, 4.0)
+    out = np.full_like(r, np.nan)
+    assert np.allclose(VerletNBodySolver._accels_loop(2.0, m, r, 4.0, out=out), expected, rtol=1e-12)
+    assert np.allclose(out, expected, rtol=1e-12)
+    assert np.allclose(VerletNBodySolver._accels_vectorized(2.0, m, r, 4.0), expected, rtol=1e-12)
+    # panels that do not divide N
+    assert np.allclose(VerletNBodySolver._accels_vectorized(2.0, m, r, 4.0, panel_rows=7), expected, rtol=1e-12)
+
+def test_barnes_hut_theta_zero_is_exact():
+    m, r = _cluster(200)
+    direct = VerletNBodySolver._accels_loop(2.0, m, r, 1.0)
+    assert np.allclose(accels_barnes_hut(2.0, m, r, 1.0, theta=0.0), direct, rtol=1e-10, atol=0.0)
+
+@pytest.mark.parametrize("theta,tol", [(0.3, 2e-3), (0.5, 1e-2)])
+def test_barnes_hut_close_to_direct_sum(theta, tol):
+    m, r = _cluster(300)
+    direct = VerletNBodySolver._accels_loop(2.0, m, r, 0.0)
+    approx = accels_barnes_hut(2.0, m, r, 0.0, theta=theta)
+    err = np.linalg.norm(approx - direct, axis=1) / np.linalg.norm(direct, axis=1)
+    assert np.median(err) < tol
+
+def test_barnes_hut_coincident_bodies():
+    m = np.ones(4)
+    r = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    a = accels_barnes_hut(1.0, m, r, 0.01, theta=0.5)
+    assert np.all(np.isfinite(a))
+    assert np.allclose(a, VerletNBodySolver._accels_loop(1.0, m, r, 0.01), rtol=1e-10)
+
+def test_vectorized_float32_kernel_close_to_float64():
+    rng = np.random.default_rng(4)
+    m = rng.uniform(1e29, 2e30, 120)   # m_j / d^3 under/overflows float32 unless normalised
+    r = rng.normal(size=(120, 3)) * 1e12 + 1e13
+    a64 = VerletNBodySolver._accels_vectorized(6.674e-11, m, r, 0.0)
+    a32 = VerletNBodySolver._accels_vectorized(6.674e-11, m, r, 0.0, np.float32)
+    assert a32.dtype == np.float64
+    err = np.linalg.norm(a32 - a64, axis=1) / np.linalg.norm(a64, axis=1)
+    assert err.max() < 1e-4
+
+def test_step_uses_current_positions():
+    from types import SimpleNamespace
+    law = SimpleNamespace(parameters={"G": SimpleNamespace(value=1.0)})
+    m, r = _cluster(10)
+    state = {"t": 0.0, "r": r / 1e3, "v": np.zeros_like(r), "m": m}
+    solver = VerletNBodySolver(vectorized=False)
+    s1 = solver.step(state, law, 1e-3)
+    # a state edited between steps is stepped from its new positions
+    edited = {**s1, "r": s1["r"] * 1.5}
+    ref = solver.step({k: edited[k] for k in ("t", "r", "v", "m")}, law, 1e-3)
+    s2 = solver.step(edited, law, 1e-3)
+    assert np.array_equal(s2["r"], ref["r"]) and np.array_equal(s2["v"], ref["v"])
+
+def test_step_many_matches_single_steps():
+    from types import SimpleNamespace
+    law = SimpleNamespace(parameters={"G": SimpleNamespace(value=1.0)})
+    m, r = _cluster(12)
+    state = {"t": 0.0, "r": r / 1e3, "v": np.zeros_like(r), "m": m}
+    solver = VerletNBodySolver()
+    ref = state
+    for _ in range(20):
+        ref = solver.step(ref, law, 1e-3)
+    out = solver.step_many(state, law, 1e-3, 20)
+    assert np.allclose(out["r"], ref["r"], rtol=1e-10, atol=1e-14)
+    assert np.allclose(out["v"], ref["v"], rtol=1e-10, atol=1e-14)
+    assert out["t"] == pytest.approx(ref["t"])
+    assert np.array_equal(state["r"], r / 1e3)   # input untouched
+    # resuming with the returned gravity continues the same trajectory
+    out2 = solver.step_many(out, law, 1e-3, 20, accels=out["a"])
+    ref2 = solver.step_many(state, law, 1e-3, 40)
+    assert np.allclose(out2["r"], ref2["r"], rtol=1e-12, atol=1e-15)
+
+def test_two_body_kernel_matches_direct_sum():
+    m = np.array([5.972e24, 7.35e22])
+    r = np.array([[1.0e3, -2.0e3, 5.0e2], [3.84e8, 1.0e6, -2.0e5]])
+    solver = VerletNBodySolver()
+    expected = _direct_reference(6.674e-11, m, r, 0.0)
+    assert np.allclose(solver._accels(6.674e-11, m, r, 0.0), expected, rtol=1e-12)
+
+def test_two_body_kernels_coincident_bodies_give_nan():
+    from worldsim_core.solvers.verlet_nb import _accels_two_body_nb
+    m = np.ones(2)
+    r = np.zeros((2, 3))
+    with pytest.warns(RuntimeWarning):
+        a = VerletNBodySolver._accels_two_body(1.0, m, r, 0.0)
+    assert np.isnan(a).all()
+    assert np.isnan(_accels_two_body_nb(1.0, m, r, 0.0, np.empty((2, 3)))).all()
+
+def test_unused_float32_kernel_dtype_warns_with_numba():
+    from worldsim_core._jit import HAVE_NUMBA
+    if HAVE_NUMBA:
+        with pytest.warns(UserWarning, match="kernel_dtype"):
+            VerletNBodySolver(kernel_dtype=np.float32)
+    else:
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            VerletNBodySolver(kernel_dtype=np.float32)